@@ -1,11 +1,31 @@
-from flask import Flask, request, jsonify, abort
+from flask import Flask, request, abort, g
 from flask_sqlalchemy import SQLAlchemy
-from flask_jwt_extended import JWTManager, jwt_required, create_access_token
+from flask_caching import Cache
+from flask_compress import Compress
+from flask_jwt_extended import JWTManager, create_access_token, verify_jwt_in_request
 from flask_jwt_extended import get_jwt_identity
-from werkzeug.security import generate_password_hash, check_password_hash
+from flask_jwt_extended.default_callbacks import default_blocklist_callback, default_token_verification_callback
+from cachetools import TLRUCache
+from sqlalchemy import insert, literal
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import load_only
+from werkzeug.security import check_password_hash
 from werkzeug.utils import secure_filename
+from argon2 import PasswordHasher, Type, extract_parameters
+from argon2.exceptions import VerificationError, InvalidHashError
 from datetime import datetime
+from typing import List, Optional, Union
+from functools import wraps
+from threading import Lock
+import hashlib
+import msgspec
+import orjson
 import os
+import re
+import shutil
+import time
 
 # Import dotenv library to load the environment variables
 from dotenv import load_dotenv
@@ -17,32 +37,184 @@ app = Flask(__name__)
 app.config['SQLALCHEMY_DATABASE_URI'] = os.getenv('DATABASE_URI')
 app.config['SECRET_KEY'] = os.getenv('SECRET_KEY')
 app.config['JWT_SECRET_KEY'] = os.getenv('JWT_SECRET_KEY')
-
+app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+if not (app.config['SQLALCHEMY_DATABASE_URI'] or 'sqlite').startswith('sqlite'):
+    # SQLite is file/memory backed and does not use a QueuePool, so these only apply to server databases
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
+        'pool_size': 10,
+        'max_overflow': 20,
+        'pool_pre_ping': True,
+        'pool_recycle': 1800,
+    }
+app.config['ARGON2_TARGET_MS'] = int(os.getenv('ARGON2_TARGET_MS', 300))
+app.config['ARGON2_MIN_TIME_COST'] = int(os.getenv('ARGON2_MIN_TIME_COST', 2))
+
+
+# Compress JSON responses (br/gzip) once they are large enough to benefit
+app.config['COMPRESS_MIMETYPES'] = ['application/json']
+app.config['COMPRESS_MIN_SIZE'] = 500
 
 db = SQLAlchemy(app)
 jwt = JWTManager(app)
+# SimpleCache lives in one process: with several workers, an update or delete would only invalidate the
+# worker that handled it. Multi-process deployments need a shared CACHE_TYPE (gunicorn_conf.py defaults to
+# FileSystemCache when it runs more than one worker; use RedisCache or similar across hosts).
+cache = Cache(app, config={
+    'CACHE_TYPE': os.getenv('CACHE_TYPE', 'SimpleCache'),
+    'CACHE_DIR': os.getenv('CACHE_DIR'),
+})
+Compress(app)
+
+ORJSON_OPTIONS = orjson.OPT_NAIVE_UTC | orjson.OPT_UTC_Z
+
+
+def jsonify(*args, **kwargs):
+    """Same contract as flask.jsonify, but encoded with orjson straight to bytes.
+
+    Naive datetimes are treated as UTC and serialized as ISO 8601 with a trailing 'Z'.
+    """
+    if args and kwargs:
+        raise TypeError('jsonify() behavior undefined when passed both args and kwargs')
+    data = args[0] if len(args) == 1 else (list(args) or kwargs)
+    return app.response_class(orjson.dumps(data, option=ORJSON_OPTIONS), mimetype='application/json')
+
+
+def fast_digest(b: bytes) -> bytes:
+    """16-byte BLAKE2b digest for non-password hashing (cache keys, upload sharding)."""
+    return hashlib.blake2b(b, digest_size=16).digest()
+
+
+# Validated JWTs keyed by a digest of the raw token. Entries expire after at most
+# JWT_CACHE_TTL seconds and never outlive the token's own exp claim.
+JWT_CACHE_TTL = 300
+_jwt_cache = TLRUCache(
+    maxsize=4096,
+    ttu=lambda key, value, now: min(value[1]['exp'], now + JWT_CACHE_TTL),
+    timer=time.time,
+)
+_jwt_cache_lock = Lock()
+
+
+def _jwt_cache_usable():
+    # Cache hits restore the claims without running flask_jwt_extended's per-request callbacks, so caching
+    # is only safe while no user lookup, blocklist or custom claims verification has been registered
+    return (jwt._user_lookup_callback is None
+            and jwt._token_in_blocklist_callback is default_blocklist_callback
+            and jwt._token_verification_callback is default_token_verification_callback)
+
+
+def cached_jwt_required():
+    """Drop-in for jwt_required() that skips signature verification for recently validated tokens."""
+    def wrapper(fn):
+        @wraps(fn)
+        def decorator(*args, **kwargs):
+            auth = request.headers.get('Authorization', '')
+            token = auth[7:] if auth.startswith('Bearer ') else None
+            key = fast_digest(token.encode()) if token and _jwt_cache_usable() else None
+
+            cached = None
+            if key is not None:
+                with _jwt_cache_lock:
+                    cached = _jwt_cache.get(key)
+
+            if cached is not None:
+                jwt_header, jwt_data = cached
+                g._jwt_extended_jwt_user = {'loaded_user': None}
+                g._jwt_extended_jwt_header = jwt_header
+                g._jwt_extended_jwt = jwt_data
+                g._jwt_extended_jwt_location = 'headers'
+            else:
+                jwt_header, jwt_data = verify_jwt_in_request()
+                if key is not None and g._jwt_extended_jwt_location == 'headers' and 'exp' in jwt_data:
+                    with _jwt_cache_lock:
+                        _jwt_cache[key] = (jwt_header, jwt_data)
+            return fn(*args, **kwargs)
+        return decorator
+    return wrapper
+
+
+# Argon2id password hasher, calibrated once per process by password_hasher().
+# Under gunicorn it is built in the master before forking, so all workers share the same parameters.
+_ph = None
+_ph_lock = Lock()
+ARGON2_MEMORY_COST = 46 * 1024  # 46 MiB
+ARGON2_MAX_TIME_COST = 10
+
+
+def _calibrate_password_hasher(target_ms):
+    """Pick the smallest Argon2 time_cost whose hash takes at least target_ms on this host."""
+    time_cost = 1
+    while True:
+        hasher = PasswordHasher(time_cost=time_cost, memory_cost=ARGON2_MEMORY_COST, parallelism=1)
+        start = time.perf_counter_ns()
+        hasher.hash('calibration-password')
+        elapsed_ms = (time.perf_counter_ns() - start) / 1e6
+        if elapsed_ms >= target_ms or time_cost >= ARGON2_MAX_TIME_COST:
+            break
+        time_cost += 1
+    # WARNING so the chosen parameters show up under Flask's and gunicorn's default log level
+    app.logger.warning('Argon2id calibrated: time_cost=%d, memory_cost=%d KiB, %.1f ms per hash',
+                       time_cost, ARGON2_MEMORY_COST, elapsed_ms)
+    return hasher
+
+
+def password_hasher():
+    """Return the process-wide hasher, calibrating it on first call."""
+    global _ph
+    if _ph is None:
+        with _ph_lock:
+            if _ph is None:
+                if app.config.get('TESTING'):
+                    # Cheap fixed parameters keep the test suite fast
+                    _ph = PasswordHasher(time_cost=1, memory_cost=8 * 1024, parallelism=1)
+                else:
+                    _ph = _calibrate_password_hasher(app.config['ARGON2_TARGET_MS'])
+    return _ph
 
 class User(db.Model):
     __tablename__ = 'users'
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
-    email = db.Column(db.String(100), unique=True, nullable=False)
-    password_hash = db.Column(db.String(128))
+    email = db.Column(db.String(100), unique=True, index=True, nullable=False)
+    password_hash = db.Column(db.String(255))
     type = db.Column(db.String(10))  # Could be 'teacher', 'student', etc.
 
     def set_password(self, password):
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = password_hasher().hash(password)
 
     def check_password(self, password):
-        return check_password_hash(self.password_hash, password)
+        # Accounts created before the switch to Argon2 still carry werkzeug hashes
+        if self.password_hash.startswith('pbkdf2:'):
+            return check_password_hash(self.password_hash, password)
+        try:
+            return password_hasher().verify(self.password_hash, password)
+        except (VerificationError, InvalidHashError):
+            return False
+
+    def needs_rehash(self):
+        if self.password_hash.startswith('pbkdf2:'):
+            return True
+        # Calibration differs between hosts and runs, so only upgrade hashes that are weaker than the
+        # configured floor instead of rehashing whenever the stored time_cost differs from ours
+        hasher = password_hasher()
+        try:
+            params = extract_parameters(self.password_hash)
+        except InvalidHashError:
+            return True
+        min_time_cost = min(app.config['ARGON2_MIN_TIME_COST'], hasher.time_cost)
+        return (params.type is not Type.ID
+                or params.memory_cost < hasher.memory_cost
+                or params.time_cost < min_time_cost)
 
 class Course(db.Model):
     __tablename__ = 'courses'
+    __table_args__ = (db.Index('ix_courses_teacher', 'teacher_id'),)
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(255), nullable=False)
     description = db.Column(db.Text, nullable=True)
     teacher_id = db.Column(db.Integer, db.ForeignKey('users.id'))
-    assignments = db.relationship('Assignment', backref='course', lazy=True)
+    # lazy='raise' so any unplanned access fails loudly instead of issuing one SELECT per course
+    assignments = db.relationship('Assignment', back_populates='course', lazy='raise')
 
 class Assignment(db.Model):
     __tablename__ = 'assignments'
@@ -52,8 +224,11 @@ class Assignment(db.Model):
     course_id = db.Column(db.Integer, db.ForeignKey('courses.id'))
     description = db.Column(db.Text, nullable=True)
 
+    course = db.relationship('Course', back_populates='assignments', lazy='raise')
+
 class Enrollment(db.Model):
     __tablename__ = 'enrollments'
+    __table_args__ = (db.Index('ix_enroll_course_student', 'course_id', 'student_id', unique=True),)
     id = db.Column(db.Integer, primary_key=True)
     course_id = db.Column(db.Integer, db.ForeignKey('courses.id'))
     student_id = db.Column(db.Integer, db.ForeignKey('users.id'))
@@ -61,6 +236,7 @@ class Enrollment(db.Model):
 
 class AssignmentSubmission(db.Model):
     __tablename__ = 'submissions'
+    __table_args__ = (db.Index('ix_sub_assignment_student', 'assignment_id', 'student_id', unique=True),)
     id = db.Column(db.Integer, primary_key=True)
     student_id = db.Column(db.Integer, db.ForeignKey('users.id'))
     assignment_id = db.Column(db.Integer, db.ForeignKey('assignments.id'))
@@ -72,41 +248,116 @@ class AssignmentSubmission(db.Model):
     assignment = db.relationship('Assignment', backref='submissions')
 
 
+# Request bodies, decoded and validated straight from the raw JSON bytes
+class RegisterReq(msgspec.Struct):
+    name: str
+    email: str
+    password: str
+    type: str
+
+class LoginReq(msgspec.Struct):
+    email: str
+    password: str
+
+class CourseReq(msgspec.Struct):
+    title: str
+    description: Optional[str] = None
+
+class CourseUpdateReq(msgspec.Struct):
+    # UNSET distinguishes an omitted field (keep current value) from an explicit null
+    title: Union[str, msgspec.UnsetType] = msgspec.UNSET
+    description: Union[Optional[str], msgspec.UnsetType] = msgspec.UNSET
+
+class AssignmentReq(msgspec.Struct):
+    name: str
+    due_date: str
+    description: Optional[str] = None
+
+class MarkReq(msgspec.Struct):
+    marks: Optional[int] = None
+    feedback: Optional[str] = None
+
+class BulkEnrollReq(msgspec.Struct):
+    student_ids: List[int]
+
+
+def _decode_body(req_type):
+    """Decode the request body into req_type, aborting with 400 if it is malformed or invalid."""
+    try:
+        return msgspec.json.decode(request.get_data(), type=req_type)
+    except (msgspec.ValidationError, msgspec.DecodeError) as e:
+        abort(400, description=str(e))
+
+
+def _owns_course(course_id):
+    """Check in a single EXISTS query that the authenticated teacher owns the course."""
+    return db.session.query(
+        db.exists().where(Course.id == course_id, Course.teacher_id == get_jwt_identity())
+    ).scalar()
+
+
 # User Registration
 @app.route('/register', methods=['POST'])
 def register():
-    data = request.json
-    if not data or not all(k in data for k in ('name', 'email', 'password', 'type')):
-        abort(400, description="Missing data for registration")
-    if User.query.filter_by(email=data['email']).first():
-        return jsonify({'message': 'Email already used'}), 409
-    user = User(name=data['name'], email=data['email'], type=data['type'])
-    user.set_password(data['password'])
+    req = _decode_body(RegisterReq)
+    user = User(name=req.name, email=req.email, type=req.type)
+    user.set_password(req.password)
     db.session.add(user)
-    db.session.commit()
+    # The unique index on users.email rejects duplicates without a separate lookup
+    try:
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()
+        return jsonify({'message': 'Email already used'}), 409
     return jsonify({'id': user.id, 'name': user.name, 'email': user.email, 'type': user.type}), 201
 
 # User Login
 @app.route('/login', methods=['POST'])
 def login():
-    data = request.json
-    user = User.query.filter_by(email=data['email']).first()
-    if user and user.check_password(data['password']):
+    req = _decode_body(LoginReq)
+    user = User.query.filter_by(email=req.email).first()
+    if user and user.check_password(req.password):
+        # Upgrade the stored hash if the Argon2 parameters have changed
+        if user.needs_rehash():
+            user.set_password(req.password)
+            db.session.commit()
         access_token = create_access_token(identity=user.id)
         return jsonify(access_token=access_token), 200
     return jsonify({"message": "Invalid credentials"}), 401
 
+MAX_PAGE_SIZE = 100
+
+def _pagination_args():
+    """Read ?limit=&offset= from the query string, clamping limit to MAX_PAGE_SIZE."""
+    limit = request.args.get('limit', MAX_PAGE_SIZE, type=int)
+    offset = request.args.get('offset', 0, type=int)
+    return max(1, min(limit, MAX_PAGE_SIZE)), max(0, offset)
+
 # Retrieve All Users
 @app.route('/users', methods=['GET'])
 def get_users():
-    users = User.query.all()
-    return jsonify([{"id": user.id, "name": user.name, "email": user.email, "type": user.type} for user in users])
+    limit, offset = _pagination_args()
+    rows = db.session.query(User.id, User.name, User.email, User.type) \
+        .order_by(User.id).limit(limit).offset(offset).all()
+
+    # A page is at most MAX_PAGE_SIZE rows, so a single body is cheap and lets Flask-Compress gzip/br it
+    return jsonify([{"id": row[0], "name": row[1], "email": row[2], "type": row[3]} for row in rows])
+
+# Error Handling for Bad Request
+@app.errorhandler(400)
+def bad_request(error):
+    return jsonify({'message': error.description}), 400
 
 # Error Handling for Not Found
 @app.errorhandler(404)
 def not_found(error):
     return jsonify({'message': 'Resource not found'}), 404
 
+# Error Handling for Oversize Uploads
+@app.errorhandler(413)
+def request_too_large(error):
+    return jsonify({'message': 'File too large'}), 413
+
 # Error Handling for Server Error
 @app.errorhandler(500)
 def server_error(error):
@@ -114,66 +365,86 @@ def server_error(error):
 
 # Course Management Routes
 @app.route('/courses', methods=['POST'])
-@jwt_required()
+@cached_jwt_required()
 def create_course():
-    data = request.json
-    course = Course(title=data['title'], description=data.get('description'), teacher_id=get_jwt_identity())
+    req = _decode_body(CourseReq)
+    course = Course(title=req.title, description=req.description, teacher_id=get_jwt_identity())
     db.session.add(course)
     db.session.commit()
     return jsonify({'id': course.id, 'title': course.title}), 201
 
+@cache.memoize(timeout=60)
+def _course_detail(course_id):
+    # Memoize the payload rather than the Response; missing courses return None, which is not cached
+    course = db.session.query(Course.id, Course.title, Course.description).filter_by(id=course_id).first()
+    if course is None:
+        return None
+    return {'id': course.id, 'title': course.title, 'description': course.description}
+
 @app.route('/courses/<int:course_id>', methods=['GET'])
 def get_course(course_id):
-    course = Course.query.get_or_404(course_id)
-    return jsonify({'id': course.id, 'title': course.title, 'description': course.description})
+    course = _course_detail(course_id)
+    if course is None:
+        abort(404)
+    return jsonify(course)
 
 @app.route('/courses', methods=['GET'])
-@jwt_required()
+@cached_jwt_required()
 def list_courses():
     # Assuming that only the authenticated teacher should see their courses
     teacher_id = get_jwt_identity()
-    courses = Course.query.filter_by(teacher_id=teacher_id).all()
+    limit, offset = _pagination_args()
+    rows = db.session.query(Course.id, Course.title, Course.description).filter_by(teacher_id=teacher_id) \
+        .order_by(Course.id).limit(limit).offset(offset).all()
 
     return jsonify([
-        {'id': course.id, 'title': course.title, 'description': course.description}
-        for course in courses
+        {'id': row[0], 'title': row[1], 'description': row[2]}
+        for row in rows
     ]), 200
 
 
 @app.route('/courses/<int:course_id>', methods=['PUT'])
-@jwt_required()
+@cached_jwt_required()
 def update_course(course_id):
-    data = request.json
-    course = Course.query.filter_by(id=course_id, teacher_id=get_jwt_identity()).first()
+    req = _decode_body(CourseUpdateReq)
+    course = Course.query.options(load_only(Course.id, Course.title, Course.description)) \
+        .filter_by(id=course_id, teacher_id=get_jwt_identity()).first()
     if not course:
         return jsonify({'message': 'Course not found or unauthorized access'}), 404
 
     # Update the course title and description
-    course.title = data.get('title', course.title)
-    course.description = data.get('description', course.description)
+    if req.title is not msgspec.UNSET:
+        course.title = req.title
+    if req.description is not msgspec.UNSET:
+        course.description = req.description
     db.session.commit()
+    cache.delete_memoized(_course_detail, course_id)
     return jsonify({'id': course.id, 'title': course.title, 'description': course.description}), 200
 
 @app.route('/courses/<int:course_id>', methods=['DELETE'])
-@jwt_required()
+@cached_jwt_required()
 def delete_course(course_id):
-    course = Course.query.filter_by(id=course_id, teacher_id=get_jwt_identity()).first()
-    if not course:
+    if not _owns_course(course_id):
         return jsonify({'message': 'Course not found or unauthorized access'}), 404
 
-    db.session.delete(course)
+    # Bulk deletes skip ORM cascades, so detach the course's assignments explicitly in the same transaction
+    Assignment.query.filter_by(course_id=course_id).update({'course_id': None}, synchronize_session=False)
+    Course.query.filter_by(id=course_id).delete(synchronize_session=False)
     db.session.commit()
+    cache.delete_memoized(_course_detail, course_id)
     return jsonify({'message': 'Course deleted successfully'}), 200
 
 UPLOAD_FOLDER = '/path/to/upload/folder'
 app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
+# Reject oversize uploads before the body is read
+app.config['MAX_CONTENT_LENGTH'] = int(os.getenv('MAX_UPLOAD_MB', 32)) * 1024 * 1024
+UPLOAD_CHUNK_SIZE = 1 << 20  # 1 MiB
 
 @app.route('/courses/<int:course_id>/materials', methods=['POST'])
-@jwt_required()
+@cached_jwt_required()
 def upload_material(course_id):
     # Ensure the authenticated user is the teacher who owns the course
-    course = Course.query.filter_by(id=course_id, teacher_id=get_jwt_identity()).first()
-    if not course:
+    if not _owns_course(course_id):
         return jsonify({'message': 'Course not found or unauthorized access'}), 404
 
     # Verify that a file is present in the request
@@ -184,30 +455,32 @@ def upload_material(course_id):
     if file.filename == '':
         return jsonify({'message': 'No file selected'}), 400
 
-    # Save the uploaded file to the configured directory
+    # Stream the upload into a shard directory so no single directory grows unbounded
     filename = secure_filename(file.filename)
-    file.save(os.path.join(app.config['UPLOAD_FOLDER'], filename))
+    shard = fast_digest(filename.encode()).hex()[:2]
+    shard_dir = os.path.join(app.config['UPLOAD_FOLDER'], shard)
+    os.makedirs(shard_dir, exist_ok=True)
+    with open(os.path.join(shard_dir, filename), 'wb', buffering=0) as out:
+        shutil.copyfileobj(file.stream, out, length=UPLOAD_CHUNK_SIZE)
     return jsonify({'message': 'File uploaded successfully'}), 201
 
 @app.route('/courses/<int:course_id>/students', methods=['GET'])
-@jwt_required()
+@cached_jwt_required()
 def list_course_students(course_id):
-    course = Course.query.filter_by(id=course_id, teacher_id=get_jwt_identity()).first()
-    if not course:
+    if not _owns_course(course_id):
         return jsonify({'message': 'Course not found or unauthorized access'}), 404
 
-    enrollments = Enrollment.query.filter_by(course_id=course_id).all()
+    rows = db.session.query(Enrollment.student_id).filter_by(course_id=course_id).all()
     return jsonify([
-        {'student_id': enrollment.student_id}
-        for enrollment in enrollments
+        {'student_id': row[0]}
+        for row in rows
     ]), 200
 
 @app.route('/courses/<int:course_id>/students/<int:student_id>', methods=['DELETE'])
-@jwt_required()
+@cached_jwt_required()
 def remove_student_from_course(course_id, student_id):
     # Ensure the authenticated user is the teacher who owns the course
-    course = Course.query.filter_by(id=course_id, teacher_id=get_jwt_identity()).first()
-    if not course:
+    if not _owns_course(course_id):
         return jsonify({'message': 'Course not found or unauthorized access'}), 404
 
     # Find the enrollment record
@@ -222,48 +495,65 @@ def remove_student_from_course(course_id, student_id):
 
 # Assignment Routes
 
+DUE_DATE_RE = re.compile(r'[0-9]{4}-[0-9]{2}-[0-9]{2}T[0-9]{2}:[0-9]{2}:[0-9]{2}Z')
+
+def _parse_due_date(value):
+    """Parse a 'YYYY-MM-DDTHH:MM:SSZ' timestamp into a naive UTC datetime."""
+    # fromisoformat accepts far more than this format on Python 3.11+ (offsets, fractions, basic format),
+    # so only hand it strings that already have the exact shape
+    if DUE_DATE_RE.fullmatch(value):
+        try:
+            # C-level ISO parser; much cheaper than walking a strptime format
+            return datetime.fromisoformat(value[:-1])
+        except ValueError:
+            pass
+    return datetime.strptime(value, '%Y-%m-%dT%H:%M:%SZ')
+
 @app.route('/courses/<int:course_id>/assignments/<int:assignment_id>/submissions/<int:student_id>/mark', methods=['PUT'])
-@jwt_required()
+@cached_jwt_required()
 def mark_submission(course_id, assignment_id, student_id):
-    data = request.json
+    req = _decode_body(MarkReq)
     # Ensure the authenticated user is the teacher who owns the course
-    course = Course.query.filter_by(id=course_id, teacher_id=get_jwt_identity()).first()
-    if not course:
+    if not _owns_course(course_id):
         return jsonify({'message': 'Course not found or unauthorized access'}), 404
 
-    # Find the specific student's submission
-    submission = AssignmentSubmission.query.filter_by(
-        assignment_id=assignment_id,
-        student_id=student_id
-    ).first()
+    # Update the student's submission in place; the assignment must belong to this course
+    updated = AssignmentSubmission.query.filter(
+        AssignmentSubmission.assignment_id == assignment_id,
+        AssignmentSubmission.student_id == student_id,
+        AssignmentSubmission.assignment_id.in_(
+            db.session.query(Assignment.id).filter_by(id=assignment_id, course_id=course_id)
+        )
+    ).update({'marks': req.marks, 'feedback': req.feedback}, synchronize_session=False)
 
-    if not submission:
+    if not updated:
         return jsonify({'message': 'Submission not found'}), 404
 
-    submission.marks = data.get('marks')
-    submission.feedback = data.get('feedback')
     db.session.commit()
     return jsonify({'message': 'Marks and feedback updated successfully'}), 200
 
 
 @app.route('/courses/<int:course_id>/assignments', methods=['POST'])
-@jwt_required()
+@cached_jwt_required()
 def add_assignment_to_course(course_id):
-    data = request.json
+    req = _decode_body(AssignmentReq)
     # Convert the due date string to a Python datetime object
-    due_date = datetime.strptime(data['due_date'], '%Y-%m-%dT%H:%M:%SZ')
+    try:
+        due_date = _parse_due_date(req.due_date)
+    except ValueError:
+        return jsonify({'message': 'Invalid due_date, expected YYYY-MM-DDTHH:MM:SSZ'}), 400
     assignment = Assignment(
-        name=data['name'],
+        name=req.name,
         due_date=due_date,
         course_id=course_id,
-        description=data.get('description')
+        description=req.description
     )
     db.session.add(assignment)
     db.session.commit()
     return jsonify({'id': assignment.id, 'name': assignment.name}), 201
 
 @app.route('/courses/<int:course_id>/assignments/<int:assignment_id>', methods=['GET'])
-@jwt_required()
+@cached_jwt_required()
 def get_assignment(course_id, assignment_id):
     assignment = Assignment.query.filter_by(id=assignment_id, course_id=course_id).first()
     if not assignment:
@@ -271,24 +561,63 @@ def get_assignment(course_id, assignment_id):
     return jsonify({
         'id': assignment.id,
         'name': assignment.name,
-        'due_date': assignment.due_date.isoformat(),
+        'due_date': assignment.due_date,
         'description': assignment.description
     }), 200
 
 # Enrollment Routes
 
 @app.route('/courses/<int:course_id>/enroll', methods=['POST'])
-@jwt_required()
+@cached_jwt_required()
 def enroll_student(course_id):
     student_id = get_jwt_identity()  # Assuming the JWT identity is the student's ID
     enrollment = Enrollment(course_id=course_id, student_id=student_id)
     db.session.add(enrollment)
-    db.session.commit()
+    try:
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()
+        return jsonify({'message': 'Student already enrolled in the course'}), 409
     return jsonify({'message': 'Student enrolled successfully'}), 200
 
+@app.route('/courses/<int:course_id>/enroll_bulk', methods=['POST'])
+@cached_jwt_required()
+def enroll_students_bulk(course_id):
+    # Ensure the authenticated user is the teacher who owns the course
+    if not _owns_course(course_id):
+        return jsonify({'message': 'Course not found or unauthorized access'}), 404
+
+    student_ids = _decode_body(BulkEnrollReq).student_ids
+    if not student_ids:
+        abort(400, description="student_ids must be a non-empty list of integers")
+
+    # One INSERT ... SELECT: ids without a user row are filtered out by the SELECT, students already
+    # enrolled by NOT EXISTS, and concurrent duplicates by ON CONFLICT where the dialect supports it
+    already_enrolled = db.session.query(Enrollment.id) \
+        .filter(Enrollment.course_id == course_id, Enrollment.student_id == User.id).exists()
+    students = db.session.query(
+        literal(course_id), User.id, literal(datetime.utcnow(), db.DateTime)
+    ).filter(User.id.in_(set(student_ids)), ~already_enrolled)
+    columns = ['course_id', 'student_id', 'enroll_date']
+    dialect = db.engine.dialect.name
+    if dialect == 'postgresql':
+        stmt = postgresql_insert(Enrollment).from_select(columns, students) \
+            .on_conflict_do_nothing(index_elements=['course_id', 'student_id'])
+    elif dialect == 'sqlite':
+        stmt = sqlite_insert(Enrollment).from_select(columns, students) \
+            .on_conflict_do_nothing(index_elements=['course_id', 'student_id'])
+    else:
+        stmt = insert(Enrollment).from_select(columns, students)
+    result = db.session.execute(stmt)
+    db.session.commit()
+    return jsonify({'message': 'Students enrolled successfully', 'enrolled': result.rowcount}), 200
+
 
+# Development server only. In production run under gunicorn instead:
+#     gunicorn -c gunicorn_conf.py app:app
 if __name__ == '__main__':
     with app.app_context():
         db.create_all()
+    password_hasher()
 
-    app.run(debug=True)  # Turn off debug for production
+    app.run(debug=os.getenv('FLASK_DEBUG') == '1')
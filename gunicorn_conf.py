@@ -0,0 +1,51 @@
+# Gunicorn configuration for production: gunicorn -c gunicorn_conf.py app:app
+#
+# gthread workers serve several requests per process; argon2-cffi releases the GIL while hashing,
+# so logins and registrations on different threads run in parallel instead of queueing.
+import os
+import shutil
+import tempfile
+
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:5000')
+workers = int(os.getenv('GUNICORN_WORKERS', 2))
+threads = int(os.getenv('GUNICORN_THREADS', 8))
+worker_class = 'gthread'
+preload_app = True
+
+# The course cache must be shared between workers so writes invalidate every reader; read by app.py at import.
+# Cache files are pickled, so use a fresh private (0700) directory per run rather than a predictable shared path;
+# workers inherit it through the environment. An explicitly configured CACHE_TYPE takes precedence.
+if workers > 1 and 'CACHE_TYPE' not in os.environ:
+    os.environ['CACHE_TYPE'] = 'FileSystemCache'
+    os.environ['CACHE_DIR'] = _private_cache_dir = tempfile.mkdtemp(prefix='claclo-cache-')
+else:
+    _private_cache_dir = None
+
+
+def on_starting(server):
+    # Create the tables and calibrate the password hasher once in the master process, before any
+    # worker starts serving; with preload_app the forked workers inherit the calibrated hasher
+    from app import app, db, password_hasher
+    with app.app_context():
+        db.create_all()
+        # Don't let forked workers inherit (and share) the master's pooled connection
+        db.engine.dispose()
+    password_hasher()
+
+
+def post_fork(server, worker):
+    # Under gevent workers let psycopg2 yield to other greenlets while waiting on Postgres. With preload_app
+    # the app (and psycopg2) is imported in the master before any gevent patching, so install psycopg2's
+    # cooperative wait callback here, in each worker
+    if server.cfg.worker_class_str.startswith('gevent'):
+        try:
+            from psycogreen.gevent import patch_psycopg
+        except ImportError:
+            return
+        patch_psycopg()
+
+
+def on_exit(server):
+    # Cached entries must not outlive the run that created them
+    if _private_cache_dir:
+        shutil.rmtree(_private_cache_dir, ignore_errors=True)
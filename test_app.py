@@ -1,45 +1,113 @@
-import os
+import io
 import pytest
-from app import app, db, User, Course, Assignment, AssignmentSubmission, Enrollment
-import shutil
+from sqlalchemy import event
+from app import app, db, cache, jwt, _jwt_cache, fast_digest, User, Course, Assignment, AssignmentSubmission, Enrollment
+
+@pytest.fixture(scope='session')
+def database():
+    """
+    Create the schema once for the whole test session.
+
+    The application is pointed at an in-memory SQLite database, which Flask-SQLAlchemy serves from a single
+    shared connection (StaticPool), so every test sees the same schema without paying for DDL again.
+
+    :return: None
+    """
+    app.config['TESTING'] = True
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+    # Pool options computed from a server DATABASE_URI at import are invalid for SQLite
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {}
+
+    with app.app_context():
+        # pysqlite defers BEGIN and ignores SAVEPOINTs; take over transaction control so rollbacks are real
+        @event.listens_for(db.engine, 'connect')
+        def disable_pysqlite_transactions(dbapi_connection, connection_record):
+            dbapi_connection.isolation_level = None
+
+        @event.listens_for(db.engine, 'begin')
+        def emit_begin(connection):
+            connection.exec_driver_sql('BEGIN')
+
+        db.create_all()
+        yield
+        db.drop_all()
+
+
+@pytest.fixture(scope='session')
+def access_token(database):
+    """
+    Register and log in a teacher once for the whole test session.
+
+    The teacher is committed outside the per-test transactions, so it survives every rollback and each test can
+    reuse the same token instead of paying for registration and login (two password hashes) again.
+
+    :return: the access token of the logged-in teacher
+    """
+    with app.test_client() as client:
+        client.post('/register', json={
+            'name': 'Teacher 1',
+            'email': 'teacher1@test.com',
+            'password': 'securepassword',
+            'type': 'teacher'
+        })
+        response = client.post('/login', json={
+            'email': 'teacher1@test.com',
+            'password': 'securepassword'
+        })
+    # Requests reused the session-wide app context, so release the connection its session still holds
+    db.session.remove()
+    return response.get_json()['access_token']
+
 
 @pytest.fixture
-def client():
+def client(access_token, tmp_path):
     """
     Create a test client for the application.
 
-    The test client is configured for testing purposes by setting the `TESTING` flag to `True` and
-    specifying the upload folder for file uploads. The upload folder is created if it does not exist.
-
-    The test client is created as a context manager to handle the setup and teardown operations
-    before and after each test. The application context is also created within the test client.
+    Each test runs inside a transaction on a dedicated connection. The application's session is bound to that
+    connection and works inside a SAVEPOINT that is reopened whenever the application commits or rolls back,
+    so request handlers behave normally while everything they write is rolled back when the test finishes.
+    It depends on `access_token` so the shared teacher is committed before any per-test transaction is opened.
+    Uploaded files go to a per-test temporary directory.
 
     :return: The test client for the application.
     """
-    app.config['TESTING'] = True
-    app.config['UPLOAD_FOLDER'] = './uploads'
-    os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
+    app.config['UPLOAD_FOLDER'] = str(tmp_path)
 
-    with app.test_client() as client:
-        with app.app_context():
-            db.create_all()
-        yield client
-        with app.app_context():
-            db.drop_all()
-        shutil.rmtree(app.config['UPLOAD_FOLDER'])
+    with app.app_context():
+        connection = db.engine.connect()
+        trans = connection.begin()
+        original_session = db.session
+        db.session = db.create_scoped_session(options={'bind': connection, 'binds': {}})
+        nested = connection.begin_nested()
+
+        @event.listens_for(db.session.session_factory, 'after_transaction_end')
+        def restart_savepoint(session, transaction):
+            nonlocal nested
+            if not nested.is_active:
+                nested = connection.begin_nested()
+
+        with app.test_client() as client:
+            yield client
+
+        db.session.remove()
+        db.session = original_session
+        trans.rollback()
+        connection.close()
+        cache.clear()
 
 
 def test_register_and_login(client):
     """
     :param client: the client object used to make API requests
-    :return: the access token of the logged-in user
+    :return: None
 
-    This method tests the functionality of registering a teacher and then logging in with the registered teacher's credentials. It verifies that the HTTP response status codes are as expected and returns the access token of the logged-in user.
+    This method tests the functionality of registering a teacher and then logging in with the registered teacher's credentials. It verifies that the HTTP response status codes are as expected and that an access token is returned.
     """
     # Register a teacher
     response = client.post('/register', json={
-        'name': 'Teacher 1',
-        'email': 'teacher1@test.com',
+        'name': 'Teacher 2',
+        'email': 'teacher2@test.com',
         'password': 'securepassword',
         'type': 'teacher'
     })
@@ -47,28 +115,27 @@ def test_register_and_login(client):
 
     # Login with the registered teacher credentials
     response = client.post('/login', json={
-        'email': 'teacher1@test.com',
+        'email': 'teacher2@test.com',
         'password': 'securepassword'
     })
     assert response.status_code == 200
-    return response.get_json()['access_token']
+    assert response.get_json()['access_token']
 
 
 # FR-TE-1: Set up exercises and assessment
-def test_create_and_get_course(client):
+def test_create_and_get_course(client, access_token):
     """
     :param client: the client used to make HTTP requests
     :return: None
 
     This method tests the functionality of creating and retrieving a course using the provided client.
 
-    1. First, it calls the function test_register_and_login to obtain the access token required for authentication.
+    1. It takes the access token required for authentication from the session-wide `access_token` fixture.
     2. It sets the headers for the HTTP request with the access token.
     3. It sends a POST request to create a course with the title 'Math 101' and the description 'Basic Math'. The response is expected to have a status code of 201 (Created).
     4. It retrieves the course ID from the response JSON.
     5. It sends a GET request to retrieve the created course using the course ID. The response is expected to have a status code of 200 (OK).
     """
-    access_token = test_register_and_login(client)
     headers = {'Authorization': f'Bearer {access_token}'}
 
     # Test creating a course
@@ -84,7 +151,7 @@ def test_create_and_get_course(client):
     assert response.status_code == 200
 
 
-def test_assignment_workflow(client):
+def test_assignment_workflow(client, access_token):
     """
     :param client: The Flask test client object used to make HTTP requests to the application.
     :return: None
@@ -98,7 +165,6 @@ def test_assignment_workflow(client):
     5. Retrieving the created assignment using a GET request to '/courses/{course_id}/assignments/{assignment_id}' endpoint.
     6. Asserting that the response status code is equal to 200.
     """
-    access_token = test_register_and_login(client)
     headers = {'Authorization': f'Bearer {access_token}'}
 
     # Create a course
@@ -121,17 +187,26 @@ def test_assignment_workflow(client):
     # Test retrieving the assignment
     response = client.get(f'/courses/{course_id}/assignments/{assignment_id}', headers=headers)
     assert response.status_code == 200
+    assert response.get_json()['due_date'] == '2024-05-31T23:59:59Z'
+
+    # Anything other than the exact YYYY-MM-DDTHH:MM:SSZ shape is rejected
+    for due_date in ('2024-05-31T23:59+01Z', '2024-05-31T235959.5Z', '2024-05-31 23:59:59Z', '2024-13-31T23:59:59Z'):
+        response = client.post(f'/courses/{course_id}/assignments', json={
+            'name': 'Assignment 2',
+            'due_date': due_date
+        }, headers=headers)
+        assert response.status_code == 400, due_date
 
 
 # FR-TE-2: Mark student works
-def test_mark_assignment(client):
+def test_mark_assignment(client, access_token):
     """
     :param client: the client object used for making HTTP requests
     :return: None
 
     This method tests the marking of an assignment submission for a specific student. It performs the following steps:
 
-    1. Calls the method `test_register_and_login` to obtain an access token for authentication.
+    1. Uses the access token from the session-wide `access_token` fixture for authentication.
     2. Sets the headers for the HTTP request with the access token.
     3. Creates a new course by making a POST request to the '/courses' endpoint with the required parameters.
     4. Extracts the course ID from the response JSON.
@@ -144,7 +219,6 @@ def test_mark_assignment(client):
     11. Marks the student's submission by making a PUT request to the '/courses/{course_id}/assignments/{assignment_id}/submissions/{student_id}/mark' endpoint with the required parameters.
     12. Asserts that the response status code is 200 and the response message is 'Marks and feedback updated successfully'.
     """
-    access_token = test_register_and_login(client)
     headers = {'Authorization': f'Bearer {access_token}'}
 
     # Create a course
@@ -186,24 +260,30 @@ def test_mark_assignment(client):
     assert response.status_code == 200
     assert response.get_json()['message'] == 'Marks and feedback updated successfully'
 
+    with app.app_context():
+        submission = AssignmentSubmission.query.filter_by(student_id=student_id, assignment_id=assignment_id).one()
+        assert submission.marks == 90
+        assert submission.feedback == 'Great job!'
+
 
 # FR-TE-3: Upload teaching material
-def test_upload_material(client):
+def test_upload_material(client, access_token, tmp_path, monkeypatch):
     """
     :param client: The client object used to make HTTP requests.
     :return: None
 
     This method tests the functionality of uploading a teaching material file for a course. It takes a client object as a parameter, which is used to make HTTP requests.
 
-    The method first calls the method test_register_and_login(client) to obtain an access token. Then, it creates a course by making a POST request to '/courses' endpoint with the required course details, including the title and description. The response from this request is stored in the `response` variable. The course ID is extracted from the response JSON and stored in the `course_id` variable.
+    The method uses the access token from the `access_token` fixture. It creates a course by making a POST request to '/courses' endpoint with the required course details, including the title and description. The response from this request is stored in the `response` variable. The course ID is extracted from the response JSON and stored in the `course_id` variable.
 
     Next, the method prepares the data for uploading the teaching material file. It sets the value for the `file` parameter as a tuple containing the file object and the filename. In this example, the file object is obtained by opening the current file (__file__) in read-binary ('rb') mode, and the filename is set as 'test_material.txt'.
 
-    Finally, the method makes a POST request to the '/courses/{course_id}/materials' endpoint with the appropriate headers and data. The response from this request is stored in the `response` variable. The method then asserts that the response status code is equal to 201 (indicating success) and the response JSON contains a 'message' key with the value 'File uploaded successfully'.
+    Finally, the method makes a POST request to the '/courses/{course_id}/materials' endpoint with the appropriate headers and data. The response from this request is stored in the `response` variable. The method then asserts that the response status code is equal to 201 (indicating success) and the response JSON contains a 'message' key with the value 'File uploaded successfully'. It also checks that the file was written, byte for byte, into its hashed shard directory under the upload folder.
 
-    Note: This method assumes that there is already an implementation of test_register_and_login(client) method, and the necessary imports for the client object and other dependencies are already done.
+    Lastly, it lowers MAX_CONTENT_LENGTH and checks that an oversize upload is rejected with a JSON 413.
+
+    Note: This method assumes the necessary imports for the client object and other dependencies are already done.
     """
-    access_token = test_register_and_login(client)
     headers = {'Authorization': f'Bearer {access_token}'}
 
     # Create a course
@@ -214,32 +294,45 @@ def test_upload_material(client):
     course_id = response.get_json()['id']
 
     # Upload a teaching material file
+    with open(__file__, 'rb') as f:
+        content = f.read()
     data = {
-        'file': (open(__file__, 'rb'), 'test_material.txt')
+        'file': (io.BytesIO(content), 'test_material.txt')
     }
     response = client.post(f'/courses/{course_id}/materials', content_type='multipart/form-data', headers=headers, data=data)
     assert response.status_code == 201
     assert response.get_json()['message'] == 'File uploaded successfully'
 
+    # The file is stored in its shard directory with the uploaded bytes
+    stored = tmp_path / fast_digest(b'test_material.txt').hex()[:2] / 'test_material.txt'
+    assert stored.read_bytes() == content
+
+    # Oversize uploads are rejected before the body is read
+    monkeypatch.setitem(app.config, 'MAX_CONTENT_LENGTH', 1024)
+    data = {
+        'file': (io.BytesIO(content), 'too_big.txt')
+    }
+    response = client.post(f'/courses/{course_id}/materials', content_type='multipart/form-data', headers=headers, data=data)
+    assert response.status_code == 413
+    assert response.get_json()['message'] == 'File too large'
+
 
 # FR-TE-4: Manage classes
-def test_manage_classes(client):
+def test_manage_classes(client, access_token):
     """
     Manage Classes Test
 
     This method tests the functionality of managing classes in the system. It performs the following actions:
 
-    1. Registers and logs in a client.
-    2. Creates a course.
-    3. Registers and enrolls a student.
-    4. Retrieves the list of students in the course.
+    1. Creates a course as the session's teacher.
+    2. Registers a student, logs in as them and enrolls them in the course.
+    3. Retrieves the list of students in the course and checks it contains exactly that student.
 
     :param client: The client object used for making requests to the API.
 
     :return: None.
 
     """
-    access_token = test_register_and_login(client)
     headers = {'Authorization': f'Bearer {access_token}'}
 
     # Create a course
@@ -257,13 +350,184 @@ def test_manage_classes(client):
         'type': 'student'
     })
     student_id = response.get_json()['id']
-    enroll_response = client.post(f'/courses/{course_id}/enroll', headers=headers)
+    response = client.post('/login', json={
+        'email': 'student2@test.com',
+        'password': 'securepassword'
+    })
+    student_headers = {'Authorization': f"Bearer {response.get_json()['access_token']}"}
+    enroll_response = client.post(f'/courses/{course_id}/enroll', headers=student_headers)
     assert enroll_response.status_code == 200, "Enrollment failed."
 
     # List students in the course
     response = client.get(f'/courses/{course_id}/students', headers=headers)
     assert response.status_code == 200
+    assert response.get_json() == [{'student_id': student_id}]
+
+
+
+def test_bulk_enroll(client, access_token):
+    """
+    Test enrolling several students at once.
+
+    Registers three students and enrolls two of them (plus an id with no user, which must be ignored) through
+    the bulk endpoint, then repeats the request with one new and one already-enrolled student to check that
+    existing enrollments are skipped rather than rejected.
+
+    :param client: The client object used for making requests to the API.
+    :return: None
+    """
+    headers = {'Authorization': f'Bearer {access_token}'}
+
+    # Create a course
+    response = client.post('/courses', json={
+        'title': 'Chemistry 101',
+        'description': 'Intro to Chemistry'
+    }, headers=headers)
+    course_id = response.get_json()['id']
+
+    # Register students
+    student_ids = []
+    for i in range(3, 6):
+        response = client.post('/register', json={
+            'name': f'Student {i}',
+            'email': f'student{i}@test.com',
+            'password': 'securepassword',
+            'type': 'student'
+        })
+        student_ids.append(response.get_json()['id'])
+
+    # Ids without a user are ignored
+    response = client.post(f'/courses/{course_id}/enroll_bulk', json={'student_ids': student_ids[:2] + [99999]},
+                           headers=headers)
+    assert response.status_code == 200
+    assert response.get_json()['enrolled'] == 2
+
+    # Already-enrolled students are skipped
+    response = client.post(f'/courses/{course_id}/enroll_bulk', json={'student_ids': student_ids[1:]}, headers=headers)
+    assert response.status_code == 200
+    assert response.get_json()['enrolled'] == 1
+
+    response = client.get(f'/courses/{course_id}/students', headers=headers)
+    assert sorted(row['student_id'] for row in response.get_json()) == sorted(student_ids)
+
+
+def test_cached_jwt(client, access_token):
+    """
+    Test the per-process cache of validated JWTs.
+
+    A token is cached after its first successful verification and later requests with it still resolve the
+    caller's identity. Tampered and expired tokens are rejected rather than served from the cache, and the
+    cache is bypassed entirely once a blocklist loader is registered.
+
+    :param client: the Flask testing client
+    :param access_token: the session teacher's access token
+    :return: None
+    """
+    from datetime import timedelta
+    from flask_jwt_extended import create_access_token
+
+    headers = {'Authorization': f'Bearer {access_token}'}
+    key = fast_digest(access_token.encode())
+    _jwt_cache.clear()
+
+    client.post('/courses', json={'title': 'Art 101'}, headers=headers)
+    assert key in _jwt_cache
+
+    # The cached path still exposes the identity: the teacher sees the course they created
+    response = client.get('/courses', headers=headers)
+    assert response.status_code == 200
+    assert [course['title'] for course in response.get_json()] == ['Art 101']
+
+    # A tampered signature is verified (and rejected) instead of matching the cached entry
+    response = client.get('/courses', headers={'Authorization': f'Bearer {access_token[:-2]}xx'})
+    assert response.status_code == 422
+
+    with app.app_context():
+        expired_token = create_access_token(identity=1, expires_delta=timedelta(seconds=-1))
+    response = client.get('/courses', headers={'Authorization': f'Bearer {expired_token}'})
+    assert response.status_code == 401
+    assert fast_digest(expired_token.encode()) not in _jwt_cache
+
+    # With a blocklist loader registered every request goes through full verification
+    original_blocklist_callback = jwt._token_in_blocklist_callback
+    jwt.token_in_blocklist_loader(lambda jwt_header, jwt_payload: True)
+    try:
+        response = client.get('/courses', headers=headers)
+        assert response.status_code == 401
+    finally:
+        jwt._token_in_blocklist_callback = original_blocklist_callback
+
+
+def test_pagination(client, access_token, monkeypatch):
+    """
+    Test ?limit=&offset= on the /users and /courses list endpoints.
+
+    Results come back in id order, out-of-range values are clamped, and limit never exceeds MAX_PAGE_SIZE.
+
+    :param client: the Flask testing client
+    :param access_token: the session teacher's access token
+    :param monkeypatch: pytest fixture used to shrink MAX_PAGE_SIZE
+    :return: None
+    """
+    headers = {'Authorization': f'Bearer {access_token}'}
+    for i in range(3):
+        client.post('/register', json={
+            'name': f'Page Student {i}',
+            'email': f'page{i}@test.com',
+            'password': 'securepassword',
+            'type': 'student'
+        })
+        client.post('/courses', json={'title': f'Course {i}'}, headers=headers)
+
+    all_ids = [user['id'] for user in client.get('/users').get_json()]
+    assert all_ids == sorted(all_ids)
+    assert len(all_ids) == 4
+
+    response = client.get('/users?limit=2&offset=1')
+    assert [user['id'] for user in response.get_json()] == all_ids[1:3]
+
+    # Out-of-range values are clamped: limit to at least 1, offset to at least 0
+    response = client.get('/users?limit=0&offset=-5')
+    assert [user['id'] for user in response.get_json()] == all_ids[:1]
 
+    response = client.get('/courses?limit=2&offset=1', headers=headers)
+    assert [course['title'] for course in response.get_json()] == ['Course 1', 'Course 2']
+
+    monkeypatch.setattr('app.MAX_PAGE_SIZE', 2)
+    assert len(client.get('/users').get_json()) == 2
+    assert len(client.get('/users?limit=1000').get_json()) == 2
+
+
+def test_invalid_request_bodies(client, access_token):
+    """
+    Test that malformed request bodies are rejected with 400.
+
+    Covers each request struct with a missing field, a wrongly typed field or a body that is not JSON at all.
+
+    :param client: the Flask testing client
+    :param access_token: the session teacher's access token
+    :return: None
+    """
+    headers = {'Authorization': f'Bearer {access_token}'}
+    course_id = client.post('/courses', json={'title': 'Music 101'}, headers=headers).get_json()['id']
+
+    requests = [
+        ('post', '/register', {'name': 'No Password', 'email': 'nopw@test.com', 'type': 'student'}),
+        ('post', '/login', {'email': 'teacher1@test.com', 'password': 12345}),
+        ('post', '/courses', {'title': 101}),
+        ('put', f'/courses/{course_id}', {'title': None}),
+        ('post', f'/courses/{course_id}/assignments', b'{"name": "Unclosed"'),
+        ('put', f'/courses/{course_id}/assignments/1/submissions/1/mark', {'marks': 'ninety'}),
+        ('post', f'/courses/{course_id}/enroll_bulk', {'student_ids': 'all'}),
+    ]
+    for method, url, body in requests:
+        if isinstance(body, bytes):
+            response = getattr(client, method)(url, data=body, content_type='application/json', headers=headers)
+        else:
+            response = getattr(client, method)(url, json=body, headers=headers)
+        assert response.status_code == 400, url
+        assert response.mimetype == 'application/json', url
+        assert response.get_json()['message'], url
 
 
 # Additional tests
@@ -320,16 +584,15 @@ def test_invalid_login(client):
     assert 'Invalid credentials' in response.get_json()['message']
 
 
-def test_update_course(client):
+def test_update_course(client, access_token):
     """
     Test update_course method.
 
     :param client: Flask test client object.
     :return: None
 
-    This method tests the functionality of the update_course endpoint. It makes use of the test_register_and_login method to authenticate the client and obtain an access_token. The method then creates a new course using the client's post method, and retrieves the newly created course's id from the response. It then updates the course using the client's put method, with the new title and description. Assertions are performed to check if the response status code is 200, and if the updated_course's title and description match the updated values.
+    This method tests the functionality of the update_course endpoint. It authenticates with the token from the `access_token` fixture. The method then creates a new course using the client's post method, and retrieves the newly created course's id from the response. It then updates the course using the client's put method, with the new title and description. Assertions are performed to check if the response status code is 200, and if the updated_course's title and description match the updated values.
     """
-    access_token = test_register_and_login(client)
     headers = {'Authorization': f'Bearer {access_token}'}
 
     # Create a course
@@ -338,6 +601,7 @@ def test_update_course(client):
         'description': 'Basic Math'
     }, headers=headers)
     course_id = response.get_json()['id']
+    client.get(f'/courses/{course_id}')
 
     # Update the course
     response = client.put(f'/courses/{course_id}', json={
@@ -349,15 +613,19 @@ def test_update_course(client):
     assert updated_course['title'] == 'Advanced Math'
     assert updated_course['description'] == 'In-depth Math'
 
+    # The cached course detail is invalidated by the update
+    response = client.get(f'/courses/{course_id}')
+    assert response.get_json()['title'] == 'Advanced Math'
+
 
-def test_delete_course(client):
+def test_delete_course(client, access_token):
     """
     :param client: the client object used to make API requests
     :return: None
 
     This method tests the delete_course functionality of the API.
 
-    The method first registers and logs in a user using the test_register_and_login method. It then creates a new course using a POST request to the '/courses' endpoint with the provided client and access token. The course details are passed as a JSON object in the request body.
+    The method authenticates with the token from the `access_token` fixture. It creates a new course using a POST request to the '/courses' endpoint with the provided client and access token. The course details are passed as a JSON object in the request body.
 
     The method retrieves the ID of the created course from the POST response and uses it to send a DELETE request to the '/courses/{course_id}' endpoint, with the corresponding course ID and headers.
 
@@ -365,9 +633,8 @@ def test_delete_course(client):
 
     Finally, the method sends a GET request to the '/courses/{course_id}' endpoint to verify that the deleted course cannot be accessed anymore. It asserts that the response status code is 404, indicating the course is not found.
 
-    Note: This method assumes that the test_register_and_login method is implemented and returns an access token. The headers used for the request include the access token for authorization.
+    Note: The headers used for the request include the access token for authorization.
     """
-    access_token = test_register_and_login(client)
     headers = {'Authorization': f'Bearer {access_token}'}
 
     # Create a course
@@ -376,12 +643,73 @@ def test_delete_course(client):
         'description': 'World History'
     }, headers=headers)
     course_id = response.get_json()['id']
+    assert client.get(f'/courses/{course_id}').status_code == 200
 
     # Delete the course
     response = client.delete(f'/courses/{course_id}', headers=headers)
     assert response.status_code == 200
 
-    # Verify the course is gone
+    # Verify the course is gone, even though its details were cached by the GET above
     response = client.get(f'/courses/{course_id}')
     assert response.status_code == 404
 
+
+def test_delete_course_with_assignment(client, access_token):
+    """
+    Test deleting a course that still has assignments.
+
+    The assignment must be detached from the deleted course, so it is not reachable through that course id
+    afterwards, even when a new course is created and reuses the id.
+
+    :param client: the client object used to make API requests
+    :param access_token: the session teacher's access token
+    :return: None
+    """
+    headers = {'Authorization': f'Bearer {access_token}'}
+
+    response = client.post('/courses', json={'title': 'Geography 101'}, headers=headers)
+    course_id = response.get_json()['id']
+    response = client.post(f'/courses/{course_id}/assignments', json={
+        'name': 'Map quiz',
+        'due_date': '2024-05-31T23:59:59Z'
+    }, headers=headers)
+    assignment_id = response.get_json()['id']
+
+    response = client.delete(f'/courses/{course_id}', headers=headers)
+    assert response.status_code == 200
+
+    with app.app_context():
+        assert db.session.get(Assignment, assignment_id).course_id is None
+
+    response = client.post('/courses', json={'title': 'Geography 102'}, headers=headers)
+    new_course_id = response.get_json()['id']
+    response = client.get(f'/courses/{new_course_id}/assignments/{assignment_id}', headers=headers)
+    assert response.status_code == 404
+
+
+
+def test_password_rehash_policy(client):
+    """
+    Test when stored password hashes are upgraded on login.
+
+    Hashes at or above the configured time_cost floor are kept even if their parameters differ from this
+    process's calibration; weaker Argon2 hashes and legacy werkzeug hashes are flagged for rehashing.
+
+    :param client: the Flask testing client
+    :return: None
+    """
+    from argon2 import PasswordHasher
+    from werkzeug.security import generate_password_hash
+
+    user = User(name='Test', email='rehash@test.com', type='teacher')
+    hasher = PasswordHasher(time_cost=3, memory_cost=8 * 1024, parallelism=1)
+
+    user.password_hash = hasher.hash('securepassword')
+    assert not user.needs_rehash()
+
+    user.password_hash = PasswordHasher(time_cost=1, memory_cost=4 * 1024, parallelism=1).hash('securepassword')
+    assert user.needs_rehash()
+
+    user.password_hash = generate_password_hash('securepassword')
+    assert user.check_password('securepassword')
+    assert user.needs_rehash()